@@ -100,6 +100,9 @@ class ContentSafety:
         self.compiled_spam = [re.compile(pattern, re.IGNORECASE) for pattern in self.SPAM_PATTERNS]
         self.compiled_explicit = [re.compile(pattern, re.IGNORECASE) for pattern in self.EXPLICIT_KEYWORDS]
         
+        # AI sensitivity calls that errored and failed open (see _ai_check_sensitivity)
+        self.ai_failures = 0
+        
         # Load additional patterns from environment if available (base64 encoded)
         self._load_custom_patterns()
         
@@ -196,6 +199,7 @@ Respond with ONLY a number 0-100."""
             
         except Exception as e:
             logger.debug(f"AI sensitivity check failed: {e}")
+            self.ai_failures += 1
             return 0.0  # Fail open (don't block on API errors)
     
     def check_clickbait(self, text: str) -> Tuple[bool, float]:
@@ -400,15 +404,29 @@ Respond with ONLY a number 0-100."""
 content_safety = ContentSafety()
 
 
+# Verdicts per (headline, description, source), oldest evicted first
+_safety_cache: Dict[Tuple[str, str, str], Tuple[bool, int, str]] = {}
+_safety_cache_size = 2048
+
+
 def is_safe_to_post(headline: str, description: str = "", source: str = "") -> Tuple[bool, int, str]:
     """
     Quick safety check for posting content.
+    Results are cached per (headline, description, source), so a story that is
+    re-fetched after a failed post isn't re-scanned. Verdicts where the AI check
+    errored (and failed open) are not cached, so the next call asks again.
     
     Returns:
         should_post: bool
         safety_score: 0-100
         reason: explanation
     """
+    key = (headline, description, source)
+    cached = _safety_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    ai_failures = content_safety.ai_failures
     result = content_safety.comprehensive_check(headline, description, source)
     safety_score, reason = content_safety.get_safety_score(headline, description, source)
     
@@ -420,4 +438,9 @@ def is_safe_to_post(headline: str, description: str = "", source: str = "") -> T
         elif result["warnings"]:
             reason = f"Low safety score: {result['warnings'][0]}"
     
-    return should_post, safety_score, reason
+    verdict = (should_post, safety_score, reason)
+    if content_safety.ai_failures == ai_failures:
+        if len(_safety_cache) >= _safety_cache_size:
+            del _safety_cache[next(iter(_safety_cache))]
+        _safety_cache[key] = verdict
+    return verdict
@@ -2,8 +2,10 @@
 Database connection pooling and caching for Supabase credit optimization
 """
 import os
-from functools import lru_cache
+from functools import lru_cache, wraps
+import httpx
 from supabase import create_client, Client
+from app.config import SUPABASE_URL, SUPABASE_KEY
 from app.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,11 +14,16 @@ logger = get_logger(__name__)
 _client_pool = {}
 
 @lru_cache(maxsize=1)
-def get_supabase_client(url: str, key: str) -> Client:
+def get_supabase_client(url: str = None, key: str = None) -> Client:
     """
     Cached Supabase client - reuses same connection instead of creating new ones
     Saves ~50% credits by avoiding connection overhead
+    Defaults to SUPABASE_URL / SUPABASE_KEY from app.config. PostgREST calls go
+    through one HTTP/2 keep-alive httpx session per client, so reusing the client
+    also reuses the TLS connection.
     """
+    url = url or SUPABASE_URL
+    key = key or SUPABASE_KEY
     cache_key = f"{url}:{key[:10]}"
     
     if cache_key not in _client_pool:
@@ -25,6 +32,47 @@ def get_supabase_client(url: str, key: str) -> Client:
     
     return _client_pool[cache_key]
 
+def reset_supabase_client():
+    """Drop the cached client(s) so the next get_supabase_client() reconnects"""
+    get_supabase_client.cache_clear()
+    _client_pool.clear()
+    logger.debug("Supabase client pool reset")
+
+def reconnect_on_drop(fn):
+    """
+    Decorator for functions taking the Supabase client as first argument.
+    A long-idle HTTP/2 keep-alive connection can be closed server-side; on
+    httpx.RemoteProtocolError recreate the client and retry once.
+    """
+    @wraps(fn)
+    def wrapper(client, *args, **kwargs):
+        try:
+            return fn(client, *args, **kwargs)
+        except httpx.RemoteProtocolError as e:
+            logger.warning(f"Supabase connection dropped in {fn.__name__} ({e}) - reconnecting")
+            reset_supabase_client()
+            return fn(get_supabase_client(), *args, **kwargs)
+    return wrapper
+
+def rpc_missing(exc: Exception) -> bool:
+    """
+    True if an rpc() error means the SQL function isn't deployed (PostgREST
+    PGRST202 / Postgres 42883). Only then is a plain-query fallback safe for
+    writes - any other error may come after the server already committed.
+    """
+    return getattr(exc, "code", None) in ("PGRST202", "42883")
+
+def exact_count(query) -> int:
+    """
+    Row count for a select(..., count="exact") query without pulling the rows.
+    postgrest-py 0.16 has no head=True for select() (and a bare HEAD loses the
+    count), so cap the body at one row and read the total from Content-Range.
+    Example: exact_count(supabase.table("stories").select("id", count="exact").eq("posted", False))
+    Also works with count="estimated" / "planned" when an approximate total is enough.
+    """
+    result = query.limit(1).execute()
+    return result.count or 0
+
 # Query result cache - avoid duplicate reads
 _query_cache = {}
 _cache_ttl = {}
@@ -4,7 +4,9 @@ Provides resilient API calls with exponential backoff and circuit breaker.
 """
 
 import time
+import random
 import functools
+from collections import deque
 from typing import Callable, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from app.logger import get_logger
@@ -70,7 +72,8 @@ def retry_with_backoff(
     initial_delay: float = 1.0,
     max_delay: float = 60.0,
     exponential_base: float = 2.0,
-    exceptions: Tuple = (Exception,)
+    exceptions: Tuple = (Exception,),
+    jitter: bool = False
 ):
     """
     Decorator for automatic retry with exponential backoff.
@@ -81,6 +84,8 @@ def retry_with_backoff(
         max_delay: Maximum delay in seconds
         exponential_base: Base for exponential backoff
         exceptions: Tuple of exceptions to catch and retry
+        jitter: Sleep a random 0-delay seconds instead of delay ("full jitter"),
+            so retrying clients don't hit a rate-limited API in lockstep
     """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -101,11 +106,12 @@ def retry_with_backoff(
                     last_exception = e
                     
                     if attempt < max_retries:
+                        sleep_for = random.uniform(0, delay) if jitter else delay
                         logger.warning(
                             f"{func.__name__} failed (attempt {attempt + 1}/{max_retries + 1}): {str(e)}. "
-                            f"Retrying in {delay:.1f}s..."
+                            f"Retrying in {sleep_for:.1f}s..."
                         )
-                        time.sleep(delay)
+                        time.sleep(sleep_for)
                         delay = min(delay * exponential_base, max_delay)
                     else:
                         logger.error(
@@ -184,28 +190,60 @@ class RateLimiter:
 class ErrorTracker:
     """Track and analyze error patterns."""
     
-    def __init__(self, window_size: int = 100):
-        self.errors = []
+    BUCKET_SECONDS = 30
+    
+    def __init__(self, window_size: int = 100, rate_window_minutes: int = 10):
+        self.errors = deque(maxlen=window_size)
         self.window_size = window_size
+        self.rate_window_minutes = rate_window_minutes
+        
+        # Rolling error counts in BUCKET_SECONDS buckets ([bucket_start, count]) with
+        # the total kept incrementally, so the rate is O(1) per read
+        self._buckets = deque()
+        self._bucket_total = 0
     
     def record_error(self, error_type: str, message: str):
         """Record an error occurrence."""
+        # Keep only recent errors (deque drops the oldest past window_size)
         self.errors.append({
             "type": error_type,
             "message": message,
             "timestamp": datetime.utcnow()
         })
         
-        # Keep only recent errors
-        if len(self.errors) > self.window_size:
-            self.errors = self.errors[-self.window_size:]
+        now = time.time()
+        bucket_start = now - now % self.BUCKET_SECONDS
+        if self._buckets and self._buckets[-1][0] == bucket_start:
+            self._buckets[-1][1] += 1
+        else:
+            self._buckets.append([bucket_start, 1])
+        self._bucket_total += 1
+        self._expire_buckets(now)
+    
+    def _expire_buckets(self, now: float):
+        """Drop buckets that ended before the rate window and subtract their counts."""
+        cutoff = now - self.rate_window_minutes * 60
+        while self._buckets and self._buckets[0][0] + self.BUCKET_SECONDS <= cutoff:
+            self._bucket_total -= self._buckets.popleft()[1]
     
     def get_error_rate(self, minutes: int = 10) -> float:
-        """Get error rate (errors per minute) in recent window."""
-        cutoff = datetime.utcnow() - timedelta(minutes=minutes)
-        recent_errors = [e for e in self.errors if e["timestamp"] > cutoff]
+        """
+        Get error rate (errors per minute) in recent window.
+        Resolution is BUCKET_SECONDS; windows longer than rate_window_minutes only
+        see the last rate_window_minutes of history.
+        """
+        if minutes <= 0:
+            return 0
+        
+        now = time.time()
+        self._expire_buckets(now)
+        
+        if minutes == self.rate_window_minutes:
+            return self._bucket_total / minutes
         
-        return len(recent_errors) / minutes if minutes > 0 else 0
+        cutoff = now - minutes * 60
+        recent = sum(count for start, count in self._buckets if start + self.BUCKET_SECONDS > cutoff)
+        return recent / minutes
     
     def get_most_common_errors(self, limit: int = 5) -> list:
         """Get most common error types."""
@@ -0,0 +1,16 @@
+"""
+Shared HTTP session for outbound API calls (Groq, imgbb, Instagram Graph).
+One keep-alive connection pool per process, so repeat calls to the same host
+skip the TCP/TLS handshake.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Status retries only apply to idempotent methods (urllib3 default), so POSTs
+# such as a Graph API publish are never replayed; connection errors are retried
+_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "fno/1.0"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_RETRY))
@@ -1,6 +1,7 @@
 """
 Utility functions: retry logic, validators, helpers.
 """
+import re
 import time
 import functools
 from typing import Callable, Any
@@ -196,6 +197,9 @@ def validate_groq_key(groq_key: str) -> tuple[bool, str]:
 # LANGUAGE DETECTION (LIGHTWEIGHT)
 # ============================================================================
 
+_DEVANAGARI_RE = re.compile(r"[\u0900-\u097F]")
+
+
 def is_nepali_text(text: str, min_ratio: float = 0.08) -> bool:
     """
     Detect Nepali/Devanagari script using Unicode range U+0900–U+097F.
@@ -203,16 +207,12 @@ def is_nepali_text(text: str, min_ratio: float = 0.08) -> bool:
     """
     if not text:
         return False
+    # Pure-ASCII text (most English headlines) cannot contain Devanagari
+    if text.isascii() and min_ratio > 0:
+        return False
 
-    total = 0
-    nepali = 0
-    for ch in text:
-        if ch.isspace():
-            continue
-        total += 1
-        if "\u0900" <= ch <= "\u097F":
-            nepali += 1
-
+    total = len("".join(text.split()))
     if total == 0:
         return False
+    nepali = len(_DEVANAGARI_RE.findall(text))
     return (nepali / total) >= min_ratio
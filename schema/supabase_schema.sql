@@ -18,10 +18,22 @@ CREATE TABLE IF NOT EXISTS stories (
   created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Set by scripts/post_instagram.py once a story has been handled
+ALTER TABLE stories ADD COLUMN IF NOT EXISTS posted BOOLEAN DEFAULT FALSE;
+
+-- Script language detected once at ingest by scripts/fetch_news.py ('ne' / 'en')
+ALTER TABLE stories ADD COLUMN IF NOT EXISTS language VARCHAR(10);
+
 CREATE INDEX IF NOT EXISTS idx_stories_hash ON stories(content_hash);
 CREATE INDEX IF NOT EXISTS idx_stories_validated ON stories(is_validated);
 CREATE INDEX IF NOT EXISTS idx_stories_published ON stories(published);
 CREATE INDEX IF NOT EXISTS idx_stories_published_at ON stories(published_at DESC);
+-- Posting queue: next validated, unposted story by recency. Partial, so it only
+-- holds the (small) backlog and the ORDER BY ... LIMIT is a straight index read
+-- (use CREATE INDEX CONCURRENTLY when adding it to a live table)
+DROP INDEX IF EXISTS idx_stories_queue;
+CREATE INDEX IF NOT EXISTS idx_stories_unposted_validated
+ON stories(published_at DESC) WHERE is_validated = true AND posted = false;
 
 ALTER TABLE stories ENABLE ROW LEVEL SECURITY;
 
@@ -45,8 +57,18 @@ CREATE TABLE IF NOT EXISTS posting_history (
   created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Per-post engagement, read by scripts/posting_optimizer.py
+ALTER TABLE posting_history ADD COLUMN IF NOT EXISTS engagement_rate DOUBLE PRECISION;
+
 CREATE INDEX IF NOT EXISTS idx_posting_history_time ON posting_history(posted_at DESC);
 
+-- Monitors and rate limits only count successful posts in a recent window
+-- (use CREATE INDEX CONCURRENTLY when adding these to a live table)
+CREATE INDEX IF NOT EXISTS idx_posting_history_posted_at_success
+  ON posting_history(posted_at DESC) WHERE success = true;
+CREATE INDEX IF NOT EXISTS idx_posting_history_created_at_success
+  ON posting_history(created_at DESC) WHERE success = true;
+
 ALTER TABLE posting_history ENABLE ROW LEVEL SECURITY;
 
 CREATE POLICY "Service role full access on posting_history"
@@ -61,3 +83,91 @@ BEGIN
   DELETE FROM posting_history WHERE created_at < NOW() - INTERVAL '30 days';
 END;
 $$ LANGUAGE plpgsql;
+
+-- Posting counts for scripts/monitor_throughput.py in a single round-trip
+CREATE OR REPLACE FUNCTION get_throughput_stats(
+  hour_ago TIMESTAMPTZ,
+  day_ago TIMESTAMPTZ,
+  today_start TIMESTAMPTZ
+)
+RETURNS TABLE (hour_count BIGINT, day_count BIGINT, today_count BIGINT, queue_count BIGINT) AS $$
+  SELECT
+    COUNT(*) FILTER (WHERE created_at >= hour_ago),
+    COUNT(*) FILTER (WHERE created_at >= day_ago),
+    COUNT(*) FILTER (WHERE created_at >= today_start),
+    (SELECT COUNT(*) FROM stories WHERE is_validated AND NOT posted)
+  FROM posting_history
+  WHERE success AND created_at >= LEAST(hour_ago, day_ago, today_start);
+$$ LANGUAGE sql STABLE;
+
+-- Successful posts today and inside the spacing window for
+-- scripts/post_instagram.py in a single round-trip
+CREATE OR REPLACE FUNCTION get_posting_counts(
+  day_start TIMESTAMPTZ,
+  window_start TIMESTAMPTZ
+)
+RETURNS TABLE (daily_count BIGINT, window_count BIGINT) AS $$
+  SELECT
+    COUNT(*) FILTER (WHERE created_at >= day_start),
+    COUNT(*) FILTER (WHERE created_at >= window_start)
+  FROM posting_history
+  WHERE success AND created_at >= LEAST(day_start, window_start);
+$$ LANGUAGE sql STABLE;
+
+-- Average engagement per hour of day over the last N days (24 rows at most)
+CREATE OR REPLACE FUNCTION engagement_by_hour(days INTEGER DEFAULT 30)
+RETURNS TABLE (hour INTEGER, avg_engagement DOUBLE PRECISION, post_count BIGINT) AS $$
+  SELECT
+    EXTRACT(HOUR FROM created_at)::INTEGER,
+    AVG(engagement_rate),
+    COUNT(*)
+  FROM posting_history
+  WHERE success
+    AND engagement_rate IS NOT NULL
+    AND created_at >= NOW() - make_interval(days => days)
+  GROUP BY 1;
+$$ LANGUAGE sql STABLE;
+
+-- Record a posting attempt and (optionally) mark the story handled in one
+-- transaction, so stories and posting_history can't drift apart
+CREATE OR REPLACE FUNCTION mark_story_posted(
+  target_story_id UUID,
+  post_success BOOLEAN,
+  err TEXT DEFAULT NULL,
+  mark_posted BOOLEAN DEFAULT TRUE
+)
+RETURNS void AS $$
+BEGIN
+  IF mark_posted THEN
+    UPDATE stories SET posted = TRUE WHERE id = target_story_id;
+  END IF;
+  -- Idempotent for successes: a retried call must not log the same post twice
+  IF post_success AND EXISTS (
+    SELECT 1 FROM posting_history WHERE story_id = target_story_id AND success
+  ) THEN
+    RETURN;
+  END IF;
+  INSERT INTO posting_history (story_id, success, error_message)
+  VALUES (target_story_id, post_success, err);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Graph API publish: flag the story published and log the media id in one
+-- transaction (scripts/post_instagram_graph.py)
+CREATE OR REPLACE FUNCTION mark_story_published(
+  target_story_id UUID,
+  media_id TEXT,
+  post_platform VARCHAR DEFAULT 'instagram_graph'
+)
+RETURNS void AS $$
+BEGIN
+  UPDATE stories SET published = TRUE, posted_at = NOW() WHERE id = target_story_id;
+  -- Idempotent: a retried call must not log the same media twice
+  IF NOT EXISTS (
+    SELECT 1 FROM posting_history WHERE story_id = target_story_id AND post_id = media_id
+  ) THEN
+    INSERT INTO posting_history (story_id, success, platform, post_id, posted_at)
+    VALUES (target_story_id, TRUE, post_platform, media_id, NOW());
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
@@ -13,12 +13,16 @@ Makes final publishing decision based on AI analysis.
 import os
 import sys
 import json
+import hashlib
 import requests
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from app.logger import get_logger
 from app.config import GROQ_API_KEY
+from app.http_session import SESSION
 
 try:
     from app.api_key_manager import get_groq_key, mark_groq_key_failed
@@ -39,10 +43,35 @@ class AIContentMonitor:
             self.api_key = GROQ_API_KEY
         self.model = "llama-3.3-70b-versatile"  # Changed from 8b to 70b
         self.api_url = "https://api.groq.com/openai/v1/chat/completions"
+        # Successful decisions keyed by a digest of the story text, so retrying
+        # the same story doesn't pay for another LLM call
+        self._decision_cache = {}
+        self._decision_cache_size = 1024
     
     def evaluate_content(self, headline: str, description: str, category: str, source: str) -> dict:
         """
         Evaluate content using AI to decide if it should be published.
+        Cached wrapper around _evaluate_content (API failures are not cached).
+        """
+        key = hashlib.blake2b(
+            f"{headline}|{description}|{category}|{source}".encode("utf-8"), digest_size=16
+        ).digest()
+        cached = self._decision_cache.get(key)
+        if cached is not None:
+            logger.info(f"🤖 AI decision (cached): {headline[:60]}...")
+            return dict(cached)
+
+        decision = self._evaluate_content(headline, description, category, source)
+        if decision.get("score", 0) > 0:
+            if len(self._decision_cache) >= self._decision_cache_size:
+                # Dicts keep insertion order - drop the oldest entry
+                del self._decision_cache[next(iter(self._decision_cache))]
+            self._decision_cache[key] = dict(decision)
+        return decision
+
+    def _evaluate_content(self, headline: str, description: str, category: str, source: str) -> dict:
+        """
+        Evaluate content using AI to decide if it should be published.
         
         Returns:
             {
@@ -66,7 +95,7 @@ class AIContentMonitor:
             else:
                 api_key = self.api_key
             
-            response = requests.post(
+            response = SESSION.post(
                 self.api_url,
                 headers={
                     "Authorization": f"Bearer {api_key}",
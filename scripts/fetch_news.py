@@ -158,6 +158,7 @@ def main():
                 continue
 
             h = content_hash(headline, url)
+            language = "ne" if is_nepali_text(f"{headline} {desc}") else "en"
 
             # Add to batch instead of immediate insert
             batch_stories.append({
@@ -168,7 +169,8 @@ def main():
                 "category": meta["category"],
                 "url": url,
                 "image_url": image_url,
-                "published_at": published_at
+                "published_at": published_at,
+                "language": language
             })
     
     # Batch insert all stories at once (saves 95% of DB calls)
@@ -192,8 +194,7 @@ def main():
                     validated = 0
                     rejected = 0
                     for story in new_stories:
-                        combined_text = f"{story['headline']} {story.get('description', '')}"
-                        if is_nepali_text(combined_text):
+                        if story["language"] == "ne":
                             eval_headline = translate_nepali_to_english(story["headline"])
                             eval_desc = rephrase_description_with_groq(
                                 story["headline"],
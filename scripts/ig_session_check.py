@@ -2,19 +2,29 @@
 Check if Instagram session is still valid.
 Run this before posting to avoid account lockouts.
 """
+import gzip
+import json
 import os
 import sys
 from instagrapi import Client
 
 def main():
-    if not os.path.exists("ig_session.json"):
+    # ig_login.py writes a .gz copy, but session refreshes rewrite only the plain
+    # JSON - validate whichever of the two is newer
+    candidates = [p for p in ("ig_session.json.gz", "ig_session.json") if os.path.exists(p)]
+    if not candidates:
         print("❌ No session found. Run: python scripts/ig_login.py")
         sys.exit(1)
+    session_path = max(candidates, key=os.path.getmtime)
     
     print("🔍 Validating Instagram session...")
     try:
         cl = Client()
-        cl.load_settings("ig_session.json")
+        if session_path.endswith(".gz"):
+            with gzip.open(session_path, "rt", encoding="utf-8") as f:
+                cl.set_settings(json.load(f))
+        else:
+            cl.load_settings(session_path)
         
         # Test session by getting user info (minimal API call)
         user = cl.account_info()
@@ -2,13 +2,77 @@
 Enhance generated images for professional appearance.
 Adds subtle effects, optimizes colors, ensures readability.
 """
-from PIL import Image, ImageEnhance, ImageFilter, ImageDraw
+from PIL import Image, ImageDraw, ImageFont, features
+import numpy as np
+from scipy import ndimage
+import functools
+import io
 import os
+import shutil
+from app.config import BODY_FONT_PATH
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# JPEG encode is the hot path here; stock Pillow wheels ship libjpeg-turbo (SIMD),
+# but source builds against plain libjpeg are 2-6x slower.
+if not features.check_feature("libjpeg_turbo"):
+    logger.warning("Pillow is not linked against libjpeg-turbo - JPEG encoding will be slow")
+
+# Optional: lossless mozjpeg pass (trellis-optimized entropy coding, no second DCT)
+try:
+    import mozjpeg_lossless_optimization
+    MOZJPEG_AVAILABLE = True
+except ImportError:
+    MOZJPEG_AVAILABLE = False
+
+# Q85 with 4:2:0 chroma is visually indistinguishable from Q95 for feed-sized
+# posts at roughly half the bytes
+JPEG_QUALITY = 85
+
+# ITU-R 601 luma weights (what PIL uses for RGB -> L)
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# PIL's ImageFilter.SMOOTH kernel, the "blurred" image ImageEnhance.Sharpness blends against
+_SMOOTH = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+
+@functools.lru_cache(maxsize=8)
+def _cached_vignette_mask(width: int, height: int, intensity_milli: int) -> np.ndarray:
+    """Build the vignette mask; intensity is in thousandths so it hashes cleanly"""
+    intensity = intensity_milli / 1000
+    
+    # The falloff is smooth, so compute it at 1/4 resolution and let PIL
+    # upsample bilinearly in C (~16x fewer pixels to synthesize)
+    small_w, small_h = max(1, width // 4), max(1, height // 4)
+    scale_x, scale_y = width / small_w, height / small_h
+    
+    # Calculate center and radius (in full-size pixels)
+    center_x, center_y = width // 2, height // 2
+    max_radius = ((width/2)**2 + (height/2)**2) ** 0.5
+    
+    # Sample each small pixel at the centre of the full-size block it covers
+    yy, xx = np.ogrid[0:small_h, 0:small_w]
+    dx = (xx + 0.5) * scale_x - 0.5 - center_x
+    dy = (yy + 0.5) * scale_y - 0.5 - center_y
+    norm = np.sqrt((dx ** 2 + dy ** 2).astype(np.float32)) / np.float32(max_radius)
+    small = (255.0 * (1.0 - intensity * norm)).clip(0, 255).astype(np.uint8)
+    
+    mask = np.asarray(Image.fromarray(small, "L").resize((width, height), Image.BILINEAR))
+    mask.setflags(write=False)  # shared between calls
+    return mask
+
 
 class ImageEnhancer:
     """Professional image enhancement pipeline"""
     
-    def enhance_post_image(self, image_path: str, output_path: str = None) -> str:
+    def enhance_post_image(
+        self,
+        image_path: str,
+        output_path: str = None,
+        contrast: float = 1.05,
+        sharpness: float = 1.1,
+        vignette: float = 0.15
+    ) -> str:
         """
         Apply professional enhancements to post image.
         
@@ -17,64 +81,138 @@ class ImageEnhancer:
         2. Add subtle vignette (darkens edges)
         3. Ensure text readability
         4. Add subtle shadow/depth
+        
+        If every enhancement is a no-op and the source is already a JPEG,
+        the file is copied as-is instead of being decoded and re-encoded.
+        """
+        return self.enhance_and_watermark(
+            image_path,
+            output_path,
+            watermark_text=None,
+            contrast=contrast,
+            sharpness=sharpness,
+            vignette=vignette
+        )
+    
+    def enhance_and_watermark(
+        self,
+        image_path: str,
+        output_path: str = None,
+        watermark_text: str = None,
+        contrast: float = 1.05,
+        sharpness: float = 1.1,
+        vignette: float = 0.15
+    ) -> str:
+        """
+        Enhance and watermark an image with a single decode and a single JPEG encode.
+        Prefer this over enhance_post_image() followed by add_watermark(), which
+        costs an extra decode and a second lossy generation.
         """
         if output_path is None:
             output_path = image_path
         
-        img = Image.open(image_path).convert("RGB")
-        
-        # Enhancement 1: Subtle contrast boost
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(1.05)  # 5% more contrast
+        img = Image.open(image_path)
+        enhance = (
+            abs(contrast - 1.0) >= 1e-3
+            or abs(sharpness - 1.0) >= 1e-3
+            or vignette > 0
+        )
         
-        # Enhancement 2: Slight sharpness
-        enhancer = ImageEnhance.Sharpness(img)
-        img = enhancer.enhance(1.1)  # 10% sharper
+        if not enhance and not watermark_text and img.format == "JPEG":
+            img.close()
+            if os.path.abspath(output_path) != os.path.abspath(image_path):
+                shutil.copyfile(image_path, output_path)
+            return output_path
         
-        # Enhancement 3: Add subtle vignette for depth
-        img = self._add_vignette(img, intensity=0.15)
+        img = img.convert("RGB")
+        if enhance:
+            img = self._enhance_pixels(img, contrast, sharpness, vignette)
+        if watermark_text:
+            self._apply_watermark(img, watermark_text)
         
         # Enhancement 4: Ensure JPEG optimization
-        img.save(
-            output_path,
-            "JPEG",
-            quality=95,
-            optimize=True,
+        self._save_jpeg(img, output_path)
+        
+        return output_path
+    
+    @staticmethod
+    def _save_jpeg(img: Image.Image, output_path: str) -> None:
+        """Encode as progressive Q85 4:2:0 JPEG, mozjpeg-optimized when available"""
+        # Progressive scans already get optimized Huffman tables, so optimize=True
+        # would only add a redundant extra pass
+        save_kwargs = dict(
+            quality=JPEG_QUALITY,
+            subsampling=2,  # 4:2:0
+            optimize=False,
             progressive=True  # Progressive JPEG for faster loading
         )
         
-        return output_path
+        if not MOZJPEG_AVAILABLE:
+            img.save(output_path, "JPEG", **save_kwargs)
+            return
+        
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", **save_kwargs)
+        with open(output_path, "wb") as f:
+            f.write(mozjpeg_lossless_optimization.optimize(buffer.getvalue()))
     
-    def _add_vignette(self, img: Image.Image, intensity: float = 0.2) -> Image.Image:
-        """Add subtle vignette effect (darkens edges)"""
-        width, height = img.size
+    def _enhance_pixels(
+        self,
+        img: Image.Image,
+        contrast: float,
+        sharpness: float,
+        vignette: float
+    ) -> Image.Image:
+        """Contrast, sharpness and vignette fused into one float pass over an RGB image"""
+        arr = np.asarray(img, dtype=np.float32)
+        height, width = arr.shape[:2]
+        
+        # Contrast and sharpening are both linear, so sharpen first and pivot
+        # contrast on the (unchanged) mean luma.
+        mean_luma = float((arr @ _LUMA).mean())
         
-        # Create radial gradient mask
-        mask = Image.new('L', (width, height), 0)
-        draw = ImageDraw.Draw(mask)
+        # Enhancement 2: Slight sharpness (10% sharper by default)
+        # Linear kernels go through ndimage.convolve (C loop). A non-linear window
+        # filter should use ndimage.vectorized_filter (SciPy >= 1.16), never
+        # generic_filter or a per-pixel PIL ImageFilter.
+        if abs(sharpness - 1.0) >= 1e-3:
+            arr = ndimage.convolve(arr, self._sharpen_kernel(sharpness)[..., None], mode="nearest")
         
-        # Calculate center and radius
-        center_x, center_y = width // 2, height // 2
-        max_radius = ((width/2)**2 + (height/2)**2) ** 0.5
+        # Enhancement 1: Subtle contrast boost (5% by default)
+        arr -= mean_luma
+        arr *= contrast
+        arr += mean_luma
         
-        # Draw concentric circles with increasing opacity
-        for i in range(100, 0, -1):
-            radius = max_radius * (i / 100)
-            opacity = int(255 * (1 - intensity * (100 - i) / 100))
-            bbox = [
-                center_x - radius, center_y - radius,
-                center_x + radius, center_y + radius
-            ]
-            draw.ellipse(bbox, fill=opacity)
+        # Enhancement 3: Add subtle vignette for depth
+        if vignette > 0:
+            arr *= self._vignette_mask(width, height, vignette)[..., None] / np.float32(255.0)
         
-        # Apply mask
-        # Create black image
-        vignette = Image.new('RGB', (width, height), (0, 0, 0))
+        np.clip(arr, 0, 255, out=arr)
+        return Image.fromarray(arr.astype(np.uint8), "RGB")
+    
+    @staticmethod
+    def _sharpen_kernel(factor: float) -> np.ndarray:
+        """3x3 kernel equivalent to ImageEnhance.Sharpness(img).enhance(factor)"""
+        identity = np.zeros((3, 3), dtype=np.float32)
+        identity[1, 1] = 1.0
+        return factor * identity - (factor - 1.0) * _SMOOTH
+    
+    @staticmethod
+    def _vignette_mask(width: int, height: int, intensity: float) -> np.ndarray:
+        """Radial falloff mask (uint8, H x W, read-only): 255 at center, darker towards corners"""
+        # Posts share a handful of sizes, so the mask is built once per size/intensity
+        return _cached_vignette_mask(width, height, int(round(intensity * 1000)))
+    
+    def _add_vignette(self, img: Image.Image, intensity: float = 0.2) -> Image.Image:
+        """Add subtle vignette effect (darkens edges)"""
+        width, height = img.size
+        mask_arr = self._vignette_mask(width, height, intensity)
         
-        # Composite original with vignette using mask
-        output = Image.composite(img, vignette, mask)
+        # Compositing over black is just a multiply by the mask
+        img_arr = np.asarray(img.convert("RGB"), dtype=np.float32)
+        img_arr *= mask_arr[..., None] / np.float32(255.0)
         
-        return output
+        return Image.fromarray(img_arr.astype(np.uint8), "RGB")
     
     def add_watermark(
         self,
@@ -86,17 +224,43 @@ class ImageEnhancer:
         if output_path is None:
             output_path = image_path
         
-        img = Image.open(image_path).convert("RGBA")
+        # Nothing to draw - don't decode/re-encode the image at all
+        if not watermark_text:
+            if os.path.abspath(output_path) != os.path.abspath(image_path):
+                shutil.copyfile(image_path, output_path)
+            return output_path
         
-        # Create watermark layer
-        watermark = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(watermark)
+        return self.enhance_and_watermark(
+            image_path,
+            output_path,
+            watermark_text=watermark_text,
+            contrast=1.0,
+            sharpness=1.0,
+            vignette=0
+        )
+    
+    def _apply_watermark(self, img: Image.Image, watermark_text: str, opacity: float = 0.35) -> None:
+        """
+        Draw semi-transparent watermark text in the bottom-right corner (in place).
+        The text is rendered into a small L-mode tile used as the paste mask, so
+        the full image never goes through an RGBA layer.
+        """
+        width, height = img.size
+        font_size = max(14, width // 45)
+        try:
+            font = ImageFont.truetype(BODY_FONT_PATH, font_size)
+        except Exception:
+            font = ImageFont.load_default()
         
-        # TODO: Add watermark text in corner
-        # with semi-transparent overlay
+        left, top, right, bottom = font.getbbox(watermark_text)
+        tile_w, tile_h = right - left, bottom - top
+        if tile_w <= 0 or tile_h <= 0:
+            return
         
-        # Composite and save
-        output = Image.alpha_composite(img, watermark)
-        output.convert('RGB').save(output_path, quality=95)
+        tile = Image.new('L', (tile_w, tile_h), 0)
+        ImageDraw.Draw(tile).text((-left, -top), watermark_text, font=font, fill=int(255 * opacity))
         
-        return output_path
+        margin = max(8, width // 40)
+        x = width - tile_w - margin
+        y = height - tile_h - margin
+        img.paste((255, 255, 255), (x, y, x + tile_w, y + tile_h), tile)
@@ -4,67 +4,96 @@ Shows if we're meeting posting goals.
 """
 import os
 import sys
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.config import SUPABASE_URL, SUPABASE_KEY
-from supabase import create_client
+from app.db_pool import get_supabase_client, exact_count
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
+def _fetch_throughput_counts(supabase, hour_ago, day_ago, today_start):
+    """
+    (last hour, last 24h, today, queue) counts in one round-trip via the
+    get_throughput_stats RPC; falls back to per-window count queries.
+    """
+    try:
+        rows = supabase.rpc("get_throughput_stats", {
+            "hour_ago": hour_ago,
+            "day_ago": day_ago,
+            "today_start": today_start,
+        }).execute().data
+        if rows:
+            row = rows[0]
+            return row["hour_count"], row["day_count"], row["today_count"], row["queue_count"]
+    except Exception as e:
+        logger.debug(f"get_throughput_stats RPC not available: {e}")
+
+    def successful_since(cutoff):
+        return exact_count(
+            supabase.table("posting_history").select("id", count="exact")
+            .gte("created_at", cutoff).eq("success", True)
+        )
+
+    def queue_count():
+        return exact_count(
+            supabase.table("stories").select("id", count="exact")
+            .eq("is_validated", True).eq("posted", False)
+        )
+
+    # Independent I/O-bound counts - overlap them so the fallback costs one
+    # round-trip of wall-clock instead of four (the httpx client is thread-safe)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(successful_since, hour_ago),
+            executor.submit(successful_since, day_ago),
+            executor.submit(successful_since, today_start),
+            executor.submit(queue_count),
+        ]
+        return tuple(future.result() for future in futures)
+
 def check_throughput():
     """Check if we're meeting 2 posts/hour target"""
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    now = datetime.now()
-    # Last hour
+    supabase = get_supabase_client()
+    # Explicit UTC offsets so PostgREST compares against stored UTC timestamps as-is
+    now = datetime.now(timezone.utc)
+    # Last hour / last 24 hours / today so far
     hour_ago = (now - timedelta(hours=1)).isoformat()
-    posts_last_hour = supabase.table("posting_history").select(
-        "id"
-    ).gte("created_at", hour_ago).eq("success", True).execute().data
-    # Last 24 hours
     day_ago = (now - timedelta(hours=24)).isoformat()
-    posts_last_day = supabase.table("posting_history").select(
-        "id"
-    ).gte("created_at", day_ago).eq("success", True).execute().data
-    # Today so far
-    today_start = now.replace(hour=0, minute=0, second=0).isoformat()
-    posts_today = supabase.table("posting_history").select(
-        "id"
-    ).gte("created_at", today_start).eq("success", True).execute().data
-    # Calculate rates
-    posts_per_hour_actual = len(posts_last_hour)
-    posts_per_day_actual = len(posts_last_day)
-    posts_today_count = len(posts_today)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    (
+        posts_per_hour_actual,
+        posts_per_day_actual,
+        posts_today_count,
+        stories_ready_count,
+    ) = _fetch_throughput_counts(supabase, hour_ago, day_ago, today_start)
     # Targets
     TARGET_PER_HOUR = 2
     TARGET_PER_DAY = 48
     # Status
     hour_status = "✅" if posts_per_hour_actual >= TARGET_PER_HOUR else "⚠️"
     day_status = "✅" if posts_per_day_actual >= TARGET_PER_DAY else "⚠️"
-    print("=" * 70)
-    print("📊 THROUGHPUT MONITORING")
-    print("=" * 70)
-    print(f"Time: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-    print()
-    print(f"{hour_status} Last Hour: {posts_per_hour_actual}/{TARGET_PER_HOUR} posts")
-    print(f"{day_status} Last 24h: {posts_per_day_actual}/{TARGET_PER_DAY} posts")
-    print(f"📈 Today: {posts_today_count} posts")
-    print()
+    logger.info("=" * 70)
+    logger.info("📊 THROUGHPUT MONITORING")
+    logger.info("=" * 70)
+    logger.info(f"Time: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("")
+    logger.info(f"{hour_status} Last Hour: {posts_per_hour_actual}/{TARGET_PER_HOUR} posts")
+    logger.info(f"{day_status} Last 24h: {posts_per_day_actual}/{TARGET_PER_DAY} posts")
+    logger.info(f"📈 Today: {posts_today_count} posts")
+    logger.info("")
     # Projection
     hours_elapsed = now.hour + (now.minute / 60)
     if hours_elapsed > 0:
         projected_daily = int((posts_today_count / hours_elapsed) * 24)
         proj_status = "✅" if projected_daily >= TARGET_PER_DAY else "⚠️"
-        print(f"{proj_status} Projected Daily: {projected_daily} posts")
-    print("=" * 70)
+        logger.info(f"{proj_status} Projected Daily: {projected_daily} posts")
+    logger.info("=" * 70)
     # Queue status
-    stories_ready = supabase.table("stories").select(
-        "id"
-    ).eq("is_validated", True).eq("posted", False).execute().data
-    print(f"📚 Queue: {len(stories_ready)} stories ready to post")
-    print("=" * 70)
+    logger.info(f"📚 Queue: {stories_ready_count} stories ready to post")
+    logger.info("=" * 70)
 
 if __name__ == "__main__":
     check_throughput()
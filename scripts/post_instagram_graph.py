@@ -3,9 +3,11 @@ Instagram Graph API Posting Script
 Posts news stories to Instagram using official Graph API
 """
 import os
+import re
 import sys
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
@@ -30,13 +32,14 @@ from app.config import (
 from app.logger import get_logger
 from app.utils import format_error_message, is_nepali_text
 from app.db import init_database
-from app.db_pool import get_supabase_client
+from app.db_pool import get_supabase_client, exact_count, rpc_missing
 from app.content_safety import is_safe_to_post
 from app.alerts import alert_manager
 from app.env_validator import validate_and_exit_if_invalid
 from app.random_scheduler import should_attempt_post, mark_successful_post
+from app.http_session import SESSION
 
-from scripts.groq_caption import generate_caption, rephrase_description_with_groq
+from scripts.groq_caption import generate_caption, rephrase_description_with_groq_both
 from scripts.template_render import render_news_on_template
 from scripts.content_filter import should_publish
 from scripts.ai_content_monitor import AIContentMonitor
@@ -56,6 +59,25 @@ FONT_BOLD = TITLE_FONT_PATH
 # Nepal timezone (UTC+5:45)
 NEPAL_TZ = timezone(timedelta(hours=5, minutes=45))
 
+# Graph API endpoints (fixed for the configured account)
+GRAPH_API_BASE = f"https://graph.facebook.com/{INSTAGRAM_API_VERSION}"
+MEDIA_CREATE_URL = f"{GRAPH_API_BASE}/{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media"
+MEDIA_PUBLISH_URL = f"{GRAPH_API_BASE}/{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media_publish"
+
+# Graph API rejects images larger than this
+GRAPH_MAX_IMAGE_BYTES = 8 * 1024 * 1024
+
+# Label prefixes stripped from headlines before they go into the caption;
+# stacked labels ("BREAKING: UPDATE: ...") are all removed
+TITLE_PREFIXES = ("BREAKING:", "UPDATE:", "URGENT:", "LIVE:", "LATEST:")
+_TITLE_PREFIX_RE = re.compile(
+    r"^(?:(?:" + "|".join(re.escape(p) for p in TITLE_PREFIXES) + r")\s*)+",
+    re.IGNORECASE,
+)
+
+# All breaking-news keywords in one case-insensitive pattern (single scan per story)
+_BREAKING_RE = re.compile("|".join(re.escape(k) for k in BREAKING_NEWS_KEYWORDS), re.IGNORECASE)
+
 
 def should_post_now():
     """Check if we should post now (skip sleeping hours)"""
@@ -76,40 +98,109 @@ def should_post_now():
     return True
 
 
-def check_daily_limit(supabase):
-    """Enforce max posts per day"""
-    now = datetime.now()
-    today = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+def count_successful_posts(supabase, since: str) -> int:
+    """Successful posts in posting_history since an ISO timestamp"""
+    return exact_count(
+        supabase.table("posting_history")
+        .select("id", count="exact")
+        .gte("created_at", since)
+        .eq("success", True)
+    )
+
 
+def fetch_post_counts(supabase):
+    """
+    (posts today, posts in the last hour) from posting_history, so posts made by
+    any runner count towards the caps. One round-trip via the get_posting_counts
+    RPC; falls back to one count query per window, and to (0, 0) if both fail.
+    """
+    now = datetime.now().astimezone()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    hour_ago = (now - timedelta(hours=1)).isoformat()
     try:
-        posts_today = (
-            supabase.table("posting_history")
-            .select("id")
-            .gte("created_at", today)
-            .eq("success", True)
-            .execute()
-            .data
-        )
+        rows = supabase.rpc("get_posting_counts", {
+            "day_start": day_start,
+            "window_start": hour_ago,
+        }).execute().data
+        if rows:
+            return rows[0]["daily_count"], rows[0]["window_count"]
+    except Exception as e:
+        logger.debug(f"get_posting_counts RPC not available: {e}")
+    try:
+        return count_successful_posts(supabase, day_start), count_successful_posts(supabase, hour_ago)
+    except Exception as e:
+        logger.warning(f"Could not count recent posts: {e}")
+        return 0, 0
 
-        if len(posts_today) >= MAX_POSTS_PER_DAY:
-            logger.info(f"Daily limit reached: {len(posts_today)}/{MAX_POSTS_PER_DAY} posts")
-            return False
 
-        logger.info(f"Daily posts: {len(posts_today)}/{MAX_POSTS_PER_DAY} - OK to continue")
-        return True
+def check_daily_limit(posts_today: int):
+    """Enforce max posts per day"""
+    if posts_today >= MAX_POSTS_PER_DAY:
+        logger.info(f"Daily limit reached: {posts_today}/{MAX_POSTS_PER_DAY} posts")
+        return False
 
-    except Exception as e:
-        logger.warning(f"Could not check daily limit: {e}")
-        return True
+    logger.info(f"Daily posts: {posts_today}/{MAX_POSTS_PER_DAY} - OK to continue")
+    return True
 
 
 def is_breaking_news(headline: str, description: str = "") -> bool:
     """Detect if a story is breaking news"""
-    combined_text = f"{headline} {description}".lower()
-    for keyword in BREAKING_NEWS_KEYWORDS:
-        if keyword in combined_text:
-            return True
-    return False
+    return bool(_BREAKING_RE.search(headline) or (description and _BREAKING_RE.search(description)))
+
+
+def _wait_container_ready(container_id: str, deadline: float = 15.0, interval: float = 0.5) -> tuple:
+    """
+    Poll a media container's status_code until Instagram finishes processing it.
+    Returns (ready: bool, status: str); ready is False only for ERROR/EXPIRED.
+    On timeout the last status is returned with ready=True so publish still
+    gets a chance (it fails cleanly if the container isn't done).
+    """
+    status_url = f"{GRAPH_API_BASE}/{container_id}"
+    params = {"fields": "status_code", "access_token": INSTAGRAM_ACCESS_TOKEN}
+    status = None
+    stop_at = time.monotonic() + deadline
+    while True:
+        try:
+            response = SESSION.get(status_url, params=params, timeout=10)
+            response.raise_for_status()
+            status = response.json().get("status_code")
+        except Exception as e:
+            logger.debug(f"Container status check failed: {e}")
+        if status == "FINISHED":
+            return True, status
+        if status in ("ERROR", "EXPIRED"):
+            return False, status
+        if time.monotonic() >= stop_at:
+            logger.warning(f"Container {container_id} still {status} after {deadline:.0f}s - trying publish anyway")
+            return True, status
+        time.sleep(interval)
+
+
+def validate_image_for_graph(image_path: str):
+    """
+    Local check against the Graph API image requirements (JPEG, <= 8 MB,
+    320-1440 px wide, aspect ratio 4:5 to 1.91:1). Only reads the file header.
+    Returns an error string, or None if the image is acceptable.
+    """
+    from PIL import Image
+
+    try:
+        file_size = os.stat(image_path).st_size
+        if file_size > GRAPH_MAX_IMAGE_BYTES:
+            return f"Image too large: {file_size} bytes"
+        with Image.open(image_path) as im:
+            image_format = im.format
+            width, height = im.size
+    except Exception as e:
+        return f"Unreadable image: {e}"
+
+    if image_format != "JPEG":
+        return f"Unsupported image format: {image_format}"
+    if not 320 <= width <= 1440:
+        return f"Image width out of range: {width}px"
+    if not 0.8 <= width / height <= 1.91:
+        return f"Image aspect ratio out of range: {width}x{height}"
+    return None
 
 
 def upload_image_to_instagram(image_path: str, caption: str) -> tuple:
@@ -132,6 +223,12 @@ def upload_image_to_instagram(image_path: str, caption: str) -> tuple:
     if not INSTAGRAM_ACCESS_TOKEN or not INSTAGRAM_BUSINESS_ACCOUNT_ID:
         return False, None, "Missing Instagram credentials"
     
+    # Fail fast on renders Instagram would reject, before any upload
+    invalid = validate_image_for_graph(image_path)
+    if invalid:
+        logger.error(f"❌ Image failed pre-upload check: {invalid}")
+        return False, None, invalid
+    
     try:
         # Upload image to public hosting (imgbb for now)
         logger.info("📤 Uploading image to public host...")
@@ -150,15 +247,13 @@ def upload_image_to_instagram(image_path: str, caption: str) -> tuple:
         # Step 1: Create media container with PUBLIC image URL
         logger.info("📤 Step 1: Creating Instagram media container...")
         
-        create_url = f"https://graph.facebook.com/{INSTAGRAM_API_VERSION}/{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media"
-        
         params = {
             "image_url": image_url,  # MUST be publicly accessible
             "caption": caption[:2200],  # Instagram limit
             "access_token": INSTAGRAM_ACCESS_TOKEN
         }
         
-        response = requests.post(create_url, data=params, timeout=30)
+        response = SESSION.post(MEDIA_CREATE_URL, data=params, timeout=30)
         response.raise_for_status()
         
         result = response.json()
@@ -169,20 +264,21 @@ def upload_image_to_instagram(image_path: str, caption: str) -> tuple:
         
         logger.info(f"✓ Container created: {container_id}")
         
-        # Wait for Instagram to process the image (recommended)
+        # Wait for Instagram to process the image (usually well under a second)
         logger.info("⏳ Waiting for Instagram to process image...")
-        time.sleep(5)
+        ready, status = _wait_container_ready(container_id)
+        if not ready:
+            return False, None, f"Container processing failed: {status}"
         
         # Step 2: Publish the media container
         logger.info("📤 Step 2: Publishing to Instagram...")
         
-        publish_url = f"https://graph.facebook.com/{INSTAGRAM_API_VERSION}/{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media_publish"
         publish_data = {
             'creation_id': container_id,
             'access_token': INSTAGRAM_ACCESS_TOKEN
         }
         
-        publish_response = requests.post(publish_url, data=publish_data, timeout=30)
+        publish_response = SESSION.post(MEDIA_PUBLISH_URL, data=publish_data, timeout=30)
         publish_response.raise_for_status()
         
         publish_result = publish_response.json()
@@ -210,6 +306,39 @@ def upload_image_to_instagram(image_path: str, caption: str) -> tuple:
         return False, None, error_msg
 
 
+def record_published(supabase, story_id, media_id):
+    """
+    Flag the story published and log the media id via the mark_story_published
+    RPC; falls back to the two separate writes if the function is missing.
+    """
+    try:
+        supabase.rpc("mark_story_published", {
+            "target_story_id": story_id,
+            "media_id": media_id,
+            "post_platform": "instagram_graph",
+        }).execute()
+        return
+    except Exception as e:
+        # A timeout or lost response may follow a committed write - only a
+        # missing function is safe to redo as plain update + insert
+        if not rpc_missing(e):
+            raise
+        logger.debug(f"mark_story_published RPC not available: {e}")
+
+    supabase.table("stories").update({
+        "published": True,
+        "posted_at": datetime.now().isoformat()
+    }).eq("id", story_id).execute()
+
+    supabase.table("posting_history").insert({
+        "story_id": story_id,
+        "success": True,
+        "platform": "instagram_graph",
+        "post_id": media_id,
+        "posted_at": datetime.now().isoformat()
+    }).execute()
+
+
 def main():
     """Main Instagram posting function using Graph API"""
     
@@ -255,27 +384,11 @@ def main():
         return
 
     # Check daily limit
-    if not check_daily_limit(supabase):
+    posts_today, posts_hour = fetch_post_counts(supabase)
+    if not check_daily_limit(posts_today):
         logger.info("Daily limit reached")
         return
 
-    # Rate checks
-    now = datetime.now()
-    hour_ago = (now - timedelta(hours=1)).isoformat()
-
-    try:
-        posts_hour = (
-            supabase.table("posting_history")
-            .select("id")
-            .gte("created_at", hour_ago)
-            .eq("success", True)
-            .execute()
-            .data
-        )
-    except Exception as e:
-        logger.warning(f"Could not check hourly rate: {e}")
-        posts_hour = []
-
     # Get next validated, unposted story
     res = (
         supabase.table("stories")
@@ -301,8 +414,8 @@ def main():
 
     max_posts_per_hour = MAX_POSTS_PER_HOUR_BREAKING if breaking else MAX_POSTS_PER_HOUR_NORMAL
 
-    if len(posts_hour) >= max_posts_per_hour:
-        msg = f"{len(posts_hour)}/{max_posts_per_hour} posts this hour"
+    if posts_hour >= max_posts_per_hour:
+        msg = f"{posts_hour}/{max_posts_per_hour} posts this hour"
         logger.info(format_error_message("rate_limited", msg))
         return
 
@@ -325,51 +438,52 @@ def main():
         }).execute()
         return
 
-    # AI content evaluation
-    logger.info("🤖 AI chatbot analyzing content...")
-    ai_decision = ai_monitor.evaluate_content(
-        story["headline"],
-        story.get("description", ""),
-        story.get("category", "general"),
-        story.get("source", "")
-    )
-    
-    logger.info(
-        f"✅ AI chatbot decision: PUBLISH "
-        f"(score: {ai_decision['score']}/100, ethics: {ai_decision['ethics_score']}, "
-        f"engagement: {ai_decision['engagement_score']}) - {ai_decision['reasoning']}"
-    )
-
     # Detect language and translate if needed
     combined_text = f"{story['headline']} {story.get('description', '')}"
     is_nepali = is_nepali_text(combined_text)
     target_language = "nepali_to_english" if is_nepali else "en"
 
-    # Generate caption with proper structure
-    caption_data = generate_caption(
-        story["headline"],
-        story.get("description", ""),
-        story.get("category", "general"),
-        language=target_language
-    )
-    
+    # The AI review, the caption and the rephrased texts are independent LLM
+    # calls - run them concurrently. Image text (concise, 2 sentences) and
+    # caption text (detailed, 3-4 sentences) come back from one request
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        logger.info("🤖 AI chatbot analyzing content...")
+        ai_future = executor.submit(
+            ai_monitor.evaluate_content,
+            story["headline"],
+            story.get("description", ""),
+            story.get("category", "general"),
+            story.get("source", "")
+        )
+        logger.info("📝 Generating content for image and caption...")
+        caption_future = executor.submit(
+            generate_caption,
+            story["headline"],
+            story.get("description", ""),
+            story.get("category", "general"),
+            language=target_language
+        )
+        rephrase_future = executor.submit(
+            rephrase_description_with_groq_both,
+            story["headline"],
+            story.get("description", ""),
+            language=target_language
+        )
+        ai_decision = ai_future.result()
+        logger.info(
+            f"✅ AI chatbot decision: PUBLISH "
+            f"(score: {ai_decision['score']}/100, ethics: {ai_decision['ethics_score']}, "
+            f"engagement: {ai_decision['engagement_score']}) - {ai_decision['reasoning']}"
+        )
+        caption_data = caption_future.result()
+        image_description, caption_description = rephrase_future.result()
+
     # Format caption with clear structure:
     # Title (Headline)
     # Paragraph (Description)
-    # Date
-    # [Space]
+    # Source
     # Hashtags
-    
-    # Parse and format the published date
-    date_str = ""
-    if story.get("published_at"):
-        try:
-            pub_date = datetime.fromisoformat(story["published_at"].replace('Z', '+00:00'))
-            date_str = pub_date.strftime("%B %d, %Y")
-        except:
-            date_str = datetime.now().strftime("%B %d, %Y")
-    else:
-        date_str = datetime.now().strftime("%B %d, %Y")
+    # (the published date is drawn on the image by render_news_on_template)
     
     # Get source
     source_str = f"Source: {story.get('source', 'Fast News')}" if story.get('source') else "Source: Fast News"
@@ -377,40 +491,20 @@ def main():
     # Get hashtags from caption generation
     hashtags = caption_data.get('hashtags', '').strip()
 
-    # Rephrase description for image (concise, 2 sentences) and caption (detailed, 3-4 sentences)
-    logger.info("📝 Generating content for image and caption...")
-    
-    # For image: concise 2-sentence summary that fits
-    image_description = rephrase_description_with_groq(
-        story["headline"],
-        story.get("description", ""),
-        language=target_language,
-        for_image=True  # Request concise version
-    )
-    
-    # For caption: detailed full context
-    caption_description = rephrase_description_with_groq(
-        story["headline"],
-        story.get("description", ""),
-        language=target_language,
-        for_image=False  # Request detailed version
-    )
     logger.info(f"✓ Image text: {image_description[:60]}...")
     logger.info(f"✓ Caption text: {caption_description[:60]}...")
     
     # Create English title from the image description (first sentence)
     # This ensures title is always in English, avoiding font rendering issues
-    if '. ' in image_description[:120]:
-        english_title = image_description[:image_description.index('. ', 0, 120) + 1].strip()
+    sentence_end = image_description.find('. ', 0, 120)
+    if sentence_end != -1:
+        english_title = image_description[:sentence_end + 1].strip()
     else:
         # If no period found, use first 80 characters
         english_title = image_description[:80].strip() + ('...' if len(image_description) > 80 else '')
     
     # Clean Nepali title for caption
-    nepali_title = story["headline"].strip()
-    for prefix in ["BREAKING:", "UPDATE:", "URGENT:", "LIVE:", "LATEST:"]:
-        if nepali_title.upper().startswith(prefix):
-            nepali_title = nepali_title[len(prefix):].strip()
+    nepali_title = _TITLE_PREFIX_RE.sub("", story["headline"].strip(), count=1)
     
     # Caption: Nepali title + Detailed description + Source + Hashtags
     caption = f"{nepali_title}\n\n{caption_description}\n\n{source_str}\n\n{hashtags}"
@@ -440,20 +534,8 @@ def main():
     if success:
         logger.info(f"✅ Posted to Instagram: {media_id}")
         
-        # Mark as published
-        supabase.table("stories").update({
-            "published": True,
-            "posted_at": datetime.now().isoformat()
-        }).eq("id", story["id"]).execute()
-
-        # Log success
-        supabase.table("posting_history").insert({
-            "story_id": story["id"],
-            "success": True,
-            "platform": "instagram_graph",
-            "post_id": media_id,
-            "posted_at": datetime.now().isoformat()
-        }).execute()
+        # Mark as published and log success (one transaction)
+        record_published(supabase, story["id"], media_id)
 
         # Update random scheduler
         mark_successful_post()
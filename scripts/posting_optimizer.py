@@ -8,6 +8,15 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Tuple
 import json
 
+# Optional: orjson reads/writes the engagement cache without Python-level parsing
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode("utf-8")
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.logger import get_logger
@@ -20,6 +29,10 @@ class PostingOptimizer:
     def __init__(self, supabase):
         self.supabase = supabase
         self.engagement_cache_file = "engagement_data.json"
+        # In-memory copy of the cache file, re-read only when its mtime changes
+        self._cache = None
+        self._cache_mtime = None
+        self._mean_engagement = 0
     
     def get_optimal_posting_time(self, category: str = "general") -> Tuple[int, int]:
         """
@@ -50,65 +63,101 @@ class PostingOptimizer:
     def _load_engagement_data(self) -> Dict:
         """Load historical engagement data"""
         
-        if os.path.exists(self.engagement_cache_file):
+        try:
+            mtime = os.stat(self.engagement_cache_file).st_mtime
+        except OSError:
+            mtime = None
+        
+        if mtime is not None:
+            if self._cache is not None and mtime == self._cache_mtime:
+                return self._cache
             try:
-                with open(self.engagement_cache_file, 'r') as f:
-                    return json.load(f)
+                with open(self.engagement_cache_file, 'rb') as f:
+                    return self._remember(_json_loads(f.read()), mtime)
             except:
                 pass
         
         # Calculate from database
         return self._calculate_engagement_by_hour()
     
+    def _remember(self, data: Dict, mtime: float) -> Dict:
+        """Keep data in memory for this file version, with its mean engagement"""
+        all_engagements = [
+            hour_data.get('avg_engagement', 0)
+            for hour_data in data.values()
+        ]
+        self._mean_engagement = sum(all_engagements) / len(all_engagements) if all_engagements else 0
+        self._cache = data
+        self._cache_mtime = mtime
+        return data
+    
     def _calculate_engagement_by_hour(self) -> Dict:
         """Calculate average engagement per hour from posting history"""
         
-        # Get posts from last 30 days
-        cutoff = (datetime.now() - timedelta(days=30)).isoformat()
-        
         try:
-            posts = self.supabase.table("posting_history").select(
-                "created_at, engagement_rate"
-            ).gte(
-                "created_at", cutoff
-            ).eq(
-                "success", True
-            ).execute().data
-            
-            # Group by hour
-            hour_data = {}
-            for post in posts:
-                try:
-                    posted_time = datetime.fromisoformat(post['created_at'])
-                    hour = posted_time.hour
-                    
-                    if hour not in hour_data:
-                        hour_data[hour] = {'total': 0, 'count': 0}
-                    
-                    engagement = post.get('engagement_rate', 0)
-                    hour_data[hour]['total'] += engagement
-                    hour_data[hour]['count'] += 1
-                except:
-                    continue
-            
-            # Calculate averages
-            result = {}
-            for hour, data in hour_data.items():
-                result[str(hour)] = {
-                    'avg_engagement': data['total'] / data['count'] if data['count'] > 0 else 0,
-                    'post_count': data['count']
+            try:
+                # Aggregated server-side: at most 24 rows come back
+                rows = self.supabase.rpc("engagement_by_hour", {"days": 30}).execute().data or []
+                result = {
+                    str(row['hour']): {
+                        'avg_engagement': row['avg_engagement'] or 0,
+                        'post_count': row['post_count']
+                    }
+                    for row in rows
                 }
+            except Exception as e:
+                logger.debug(f"engagement_by_hour RPC not available: {e}")
+                result = self._engagement_by_hour_from_rows()
             
             # Cache results
-            with open(self.engagement_cache_file, 'w') as f:
-                json.dump(result, f)
+            with open(self.engagement_cache_file, 'wb') as f:
+                f.write(_json_dumps(result))
             
-            return result
+            return self._remember(result, os.stat(self.engagement_cache_file).st_mtime)
             
         except Exception as e:
             logger.error(f"Failed to calculate engagement data: {e}")
             return {}
     
+    def _engagement_by_hour_from_rows(self) -> Dict:
+        """Fallback for _calculate_engagement_by_hour: group 30 days of rows locally"""
+        
+        # Get posts from last 30 days
+        cutoff = (datetime.now() - timedelta(days=30)).isoformat()
+        
+        posts = self.supabase.table("posting_history").select(
+            "created_at, engagement_rate"
+        ).gte(
+            "created_at", cutoff
+        ).eq(
+            "success", True
+        ).execute().data
+        
+        # Group by hour
+        hour_data = {}
+        for post in posts:
+            try:
+                posted_time = datetime.fromisoformat(post['created_at'])
+                hour = posted_time.hour
+                
+                if hour not in hour_data:
+                    hour_data[hour] = {'total': 0, 'count': 0}
+                
+                engagement = post.get('engagement_rate', 0)
+                hour_data[hour]['total'] += engagement
+                hour_data[hour]['count'] += 1
+            except:
+                continue
+        
+        # Calculate averages
+        result = {}
+        for hour, data in hour_data.items():
+            result[str(hour)] = {
+                'avg_engagement': data['total'] / data['count'] if data['count'] > 0 else 0,
+                'post_count': data['count']
+            }
+        return result
+    
     def should_post_now(self) -> Tuple[bool, str]:
         """
         Intelligent decision on whether to post right now.
@@ -141,12 +190,8 @@ class PostingOptimizer:
         current_hour_data = engagement_data.get(str(current_hour), {})
         avg_engagement = current_hour_data.get('avg_engagement', 0)
         
-        # Calculate threshold (mean engagement across all hours)
-        all_engagements = [
-            data.get('avg_engagement', 0)
-            for data in engagement_data.values()
-        ]
-        mean_engagement = sum(all_engagements) / len(all_engagements) if all_engagements else 0
+        # Threshold: mean engagement across all hours (computed when the data was loaded)
+        mean_engagement = self._mean_engagement
         
         # Post if current hour is above average
         if avg_engagement >= mean_engagement:
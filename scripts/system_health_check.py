@@ -4,7 +4,7 @@ System Health Check - Verify News_Bot is production-ready
 """
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -107,7 +107,7 @@ def check_posting_rate():
         
         # Last 24 hours
         now = datetime.now()
-        yesterday = now.replace(hour=now.hour - 24).isoformat()
+        yesterday = (now - timedelta(hours=24)).isoformat()
         
         posts = (
             supabase.table("posting_history")
@@ -117,8 +117,9 @@ def check_posting_rate():
             .data
         )
         
-        successful = [p for p in posts if p.get("success")]
-        failed = [p for p in posts if not p.get("success")]
+        successful, failed = [], []
+        for p in posts:
+            (successful if p.get("success") else failed).append(p)
         
         print(f"✅ Posts in last 24h: {len(posts)}")
         print(f"   - Successful: {len(successful)}")
@@ -3,10 +3,18 @@ Dynamic template system with multiple layouts.
 Automatically selects best template for each story type.
 """
 import os
+import re
 from typing import Tuple, Optional
 from PIL import Image, ImageDraw, ImageFont
 from enum import Enum
 
+# Compiled once at import: template selection runs for every story
+# Pattern: "X-Y" or "X vs Y" or "X:Y"
+_SCORE_RE = re.compile(r'\d+[-:]\d+|\d+\s+vs\s+\d+')
+# Substring match (like the old `kw in headline.lower()` checks), one pass, no lowercase copy
+_BREAKING_RE = re.compile(r'breaking|just in|urgent|alert|developing|live|update', re.IGNORECASE)
+
+
 class TemplateType(Enum):
     """Different template layouts for different story types"""
     BREAKING_NEWS = "breaking"      # Large text, urgent feel
@@ -64,24 +72,15 @@ class TemplateManager:
     
     def _is_breaking_news(self, headline: str) -> bool:
         """Detect breaking news from headline"""
-        breaking_keywords = [
-            'breaking', 'just in', 'urgent', 'alert',
-            'developing', 'live', 'update'
-        ]
-        headline_lower = headline.lower()
-        return any(kw in headline_lower for kw in breaking_keywords)
+        return bool(_BREAKING_RE.search(headline))
     
     def _has_scores(self, headline: str, description: str) -> bool:
         """Detect sports scores"""
-        import re
-        combined = f"{headline} {description}"
-        # Pattern: "X-Y" or "X vs Y" or "X:Y"
-        score_pattern = r'\d+[-:]\d+|\d+\s+vs\s+\d+'
-        return bool(re.search(score_pattern, combined))
+        return bool(_SCORE_RE.search(headline) or _SCORE_RE.search(description))
     
     def _has_quote(self, description: str) -> bool:
         """Detect if story contains a notable quote"""
-        return '"' in description and description.count('"') >= 2
+        return description.count('"') >= 2
     
     def _get_template_path(self, template_type: TemplateType) -> str:
         """Get full path to template file"""
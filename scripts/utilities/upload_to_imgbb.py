@@ -5,10 +5,17 @@ This is a helper for Instagram Graph API which requires public URLs
 For production, use S3/CloudFlare instead.
 """
 import os
+import mimetypes
 import requests
 import base64
 from dotenv import load_dotenv
 
+# Reuse the shared keep-alive session when the repo root is importable
+try:
+    from app.http_session import SESSION
+except ImportError:
+    SESSION = requests.Session()
+
 load_dotenv()
 
 IMGBB_API_KEY = os.getenv('IMGBB_API_KEY')
@@ -39,7 +46,7 @@ def upload_image_bytes_to_imgbb(image_bytes: bytes, api_key: str = None) -> str:
             'image': image_b64
         }
         
-        response = requests.post(url, data=payload, timeout=30)
+        response = SESSION.post(url, data=payload, timeout=30)
         response.raise_for_status()
         
         result = response.json()
@@ -69,9 +76,6 @@ def upload_image_to_imgbb(image_path: str, expiration: int = 3600) -> tuple:
         return False, None, "IMGBB_API_KEY not set in .env"
     
     try:
-        with open(image_path, 'rb') as f:
-            image_data = f.read()
-        
         url = "https://api.imgbb.com/1/upload"
         
         payload = {
@@ -79,11 +83,14 @@ def upload_image_to_imgbb(image_path: str, expiration: int = 3600) -> tuple:
             'expiration': expiration  # Auto-delete after X seconds
         }
         
-        files = {
-            'image': ('image.jpg', image_data, 'image/jpeg')
-        }
-        
-        response = requests.post(url, data=payload, files=files, timeout=30)
+        # Hand requests the open file so the multipart body is built straight
+        # from it (no separate read() copy, no base64)
+        mime_type = mimetypes.guess_type(image_path)[0] or 'image/jpeg'
+        with open(image_path, 'rb') as f:
+            files = {
+                'image': (os.path.basename(image_path), f, mime_type)
+            }
+            response = SESSION.post(url, data=payload, files=files, timeout=30)
         response.raise_for_status()
         
         result = response.json()